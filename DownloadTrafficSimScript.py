@@ -1,27 +1,112 @@
-import requests
-from bs4 import BeautifulSoup
-import random
 import time
+SCRIPT_START = time.perf_counter()
+
+import random
 import os
 import sys
 import shutil
-import urllib3
 import warnings
 import argparse
 import datetime
 import socket
+import queue
+import threading
+import ipaddress
+from collections import OrderedDict
 from urllib.parse import urljoin, urlparse
 
 # --- Configuration Constants (Defaults handled in argparse) ---
 LOG_FOLDER_NAME = "OUTPUT_LOGS"
 
-# --- SSL & Warning Suppression ---
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-warnings.filterwarnings("ignore", category=UserWarning, module='bs4')
+# Plain-text "what is my IP" services, tried in order
+PUBLIC_IP_SERVICES = [
+    "https://api.ipify.org",
+    "https://icanhazip.com",
+    "https://checkip.amazonaws.com",
+    "https://ifconfig.me/ip",
+]
+PUBLIC_IP_TIMEOUT = 3
+
+# --- Heavy Imports (loaded on demand by the tests that need them) ---
+requests = None
+BeautifulSoup = None
+
+def import_requests():
+    """Imports requests on first use and silences the unverified-SSL warnings."""
+    global requests
+    if requests is None:
+        import requests as _requests
+        import urllib3
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        requests = _requests
+    return requests
+
+def import_bs4():
+    """Imports BeautifulSoup (and lxml through it) only when the crawl test runs."""
+    global BeautifulSoup
+    if BeautifulSoup is None:
+        from bs4 import BeautifulSoup as _BeautifulSoup
+        warnings.filterwarnings("ignore", category=UserWarning, module='bs4')
+        BeautifulSoup = _BeautifulSoup
+    return BeautifulSoup
+
+# --- Bounded Cache Helper ---
+class LRUCache:
+    """
+    Size-bounded mapping that evicts the least recently used entry.
+    Bounded by entry count and, when max_bytes > 0, by the total of the sizes
+    passed to put(). An entry larger than the whole byte budget is refused
+    rather than flushing every other entry to make room.
+    """
+
+    def __init__(self, max_entries, max_bytes=0):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self.total_bytes = 0
+        self.data = OrderedDict()
+        self.sizes = {}
+
+    def get(self, key):
+        if key not in self.data:
+            return None
+        self.data.move_to_end(key)
+        return self.data[key]
+
+    def fits(self, size):
+        """True if an entry of `size` bytes can be held within the byte budget."""
+        return not self.max_bytes or size <= self.max_bytes
+
+    def put(self, key, value, size=0):
+        """Stores `value`, evicting LRU entries as needed. Returns False if it can never fit."""
+        if not self.fits(size):
+            return False
+        self.total_bytes += size - self.sizes.get(key, 0)
+        self.sizes[key] = size
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while self.data and (len(self.data) > self.max_entries
+                             or (self.max_bytes and self.total_bytes > self.max_bytes)):
+            evicted, _ = self.data.popitem(last=False)
+            self.total_bytes -= self.sizes.pop(evicted)
+        return True
+
+    def describe(self):
+        """Short 'entries, bytes' usage string for logs."""
+        usage = f"{len(self.data)}/{self.max_entries} entries"
+        if self.max_bytes:
+            usage += f", {format_size(self.total_bytes)}/{format_size(self.max_bytes)}"
+        return usage
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
 
 # --- Global Logger Setup ---
 CURRENT_LOG_FILE = None
-HOST_CACHE = {}
+HOST_CACHE_MAX = 512
+HOST_CACHE = LRUCache(HOST_CACHE_MAX)
 
 def setup_logging():
     """Creates the log directory and generates the log filename for this run."""
@@ -58,16 +143,47 @@ def log(message, end="\n"):
         except Exception:
             pass
 
-def get_system_public_ip():
-    """Fetches the external public IP address of this system."""
-    try:
-        response = requests.get('https://api.ipify.org', timeout=5)
-        if response.status_code == 200:
-            return response.text.strip()
-    except Exception:
-        return "Unavailable"
+def get_system_public_ip(timeout=PUBLIC_IP_TIMEOUT):
+    """
+    Fetches the external public IP address of this system.
+    Tries each PUBLIC_IP_SERVICES endpoint with a short timeout.
+    """
+    # Loaded here, on the background thread, to keep them off the startup path
+    import ssl
+    import urllib.request
+
+    context = ssl._create_unverified_context()
+
+    for service in PUBLIC_IP_SERVICES:
+        try:
+            with urllib.request.urlopen(service, timeout=timeout, context=context) as response:
+                ip_str = response.read(64).decode('ascii', 'ignore').strip()
+            ipaddress.ip_address(ip_str)
+            return ip_str
+        except Exception:
+            continue
     return "Unavailable"
 
+def start_public_ip_lookup():
+    """Resolves the public IP on a daemon thread so startup never waits on it."""
+    result = {'ip': None}
+
+    def worker():
+        result['ip'] = get_system_public_ip()
+
+    thread = threading.Thread(target=worker, name="public-ip-lookup", daemon=True)
+    thread.start()
+    return thread, result
+
+def report_public_ip(lookup, wait=0.0):
+    """Logs the public IP if the background lookup has finished. Returns True once logged."""
+    thread, result = lookup
+    thread.join(timeout=wait)
+    if thread.is_alive():
+        return False
+    log(f"System Public IP: {result['ip']}")
+    return True
+
 def get_ip_info(url):
     """
     Resolves DNS and performs a simplified GeoIP lookup.
@@ -77,8 +193,9 @@ def get_ip_info(url):
         parsed = urlparse(url)
         hostname = parsed.netloc
         
-        if hostname in HOST_CACHE:
-            return HOST_CACHE[hostname]
+        cached = HOST_CACHE.get(hostname)
+        if cached is not None:
+            return cached
 
         ip = socket.gethostbyname(hostname)
 
@@ -92,7 +209,7 @@ def get_ip_info(url):
             country_code = "Err"
 
         result = {'ip': ip, 'cc': country_code}
-        HOST_CACHE[hostname] = result
+        HOST_CACHE.put(hostname, result)
         return result
 
     except Exception:
@@ -120,6 +237,9 @@ def test_website_traffic(url_list, request_delay):
     if not url_list:
         return
 
+    import_requests()
+    import_bs4()
+
     log("\n" + "="*130)
     log(f"STARTING WEBSITE CRAWL TEST (SSL Verify Disabled)")
     log("="*130)
@@ -239,12 +359,115 @@ def format_size(size_in_bytes):
     if size_in_bytes >= 1024**3: return f"{size_in_bytes / (1024**3):.2f} GB"
     return f"{size_in_bytes / (1024**2):.2f} MB"
 
-def test_large_file_traffic(url_list, request_delay):
+def preallocate_file(f, size):
+    """Reserves `size` bytes for a download up front. Returns True if space was reserved."""
+    if size <= 0:
+        return False
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            # Windows: extend the file once instead of growing it chunk by chunk
+            f.truncate(size)
+        return True
+    except OSError:
+        return False
+
+class DiskWriter:
+    """
+    Writes a download to disk and times the writes.
+    Threaded mode preallocates the file, coalesces chunks into large buffers and
+    hands them to a writer thread through a bounded queue, so a slow disk or an
+    on-access AV/DLP scanner no longer stalls the socket read loop.
+    Inline mode writes each chunk directly, as before.
+    """
+
+    def __init__(self, path, expected_size=0, threaded=False, buffer_size=4 * 1024 * 1024, queue_depth=8):
+        self.file = open(path, 'wb')
+        self.threaded = threaded
+        self.buffer_size = buffer_size
+        self.pending = bytearray()
+        self.bytes_written = 0
+        self.write_time = 0.0
+        self.stall_time = 0.0
+        self.error = None
+        self.preallocated = preallocate_file(self.file, expected_size) if threaded else False
+
+        if threaded:
+            self.queue = queue.Queue(maxsize=max(1, queue_depth))
+            self.thread = threading.Thread(target=self.run, name="disk-writer", daemon=True)
+            self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def run(self):
+        while True:
+            buffer = self.queue.get()
+            if buffer is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                self._write(buffer)
+            except Exception as e:
+                self.error = e
+
+    def _write(self, buffer):
+        start = time.perf_counter()
+        self.file.write(buffer)
+        self.write_time += time.perf_counter() - start
+        self.bytes_written += len(buffer)
+
+    def _submit(self):
+        if self.error is not None:
+            raise self.error
+        start = time.perf_counter()
+        self.queue.put(self.pending)
+        self.stall_time += time.perf_counter() - start
+        self.pending = bytearray()
+
+    def write(self, chunk):
+        if not self.threaded:
+            self._write(chunk)
+            return
+        self.pending += chunk
+        if len(self.pending) >= self.buffer_size:
+            self._submit()
+
+    def close(self):
+        """Drains queued buffers, trims unused preallocation and closes the file."""
+        if self.file.closed:
+            return
+        try:
+            if self.threaded:
+                if self.pending and self.error is None:
+                    self._submit()
+                self.queue.put(None)
+                self.thread.join()
+            start = time.perf_counter()
+            if self.preallocated:
+                self.file.truncate(self.bytes_written)
+            self.file.close()
+            self.write_time += time.perf_counter() - start
+        finally:
+            if not self.file.closed:
+                self.file.close()
+        if self.error is not None:
+            raise self.error
+
+def test_large_file_traffic(url_list, request_delay, disk_writer=False, write_buffer_mb=4, write_queue=8):
     if not url_list:
         return
 
+    import_requests()
+
     log("\n" + "="*130)
-    log(f"STARTING LARGE FILE DOWNLOAD TEST (SSL Verify Disabled)")
+    log(f"STARTING LARGE FILE DOWNLOAD TEST (SSL Verify Disabled{', Threaded Disk Writer' if disk_writer else ''})")
     log("="*130)
 
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Bot/Testing'}
@@ -261,6 +484,7 @@ def test_large_file_traffic(url_list, request_delay):
         cc_display = info['cc']
 
         total_downloaded = 0
+        net_time = 0.0
         start_time = time.time()
         
         try:
@@ -268,10 +492,14 @@ def test_large_file_traffic(url_list, request_delay):
                 r.raise_for_status()
                 total_size = int(r.headers.get('content-length', 0))
                 
-                with open(local_filename, 'wb') as f:
+                writer = DiskWriter(local_filename, total_size, threaded=disk_writer,
+                                    buffer_size=write_buffer_mb * 1024 * 1024, queue_depth=write_queue)
+                with writer:
+                    read_mark = time.perf_counter()
                     for chunk in r.iter_content(chunk_size=8192):
+                        net_time += time.perf_counter() - read_mark
                         if chunk:
-                            f.write(chunk)
+                            writer.write(chunk)
                             total_downloaded += len(chunk)
                             
                             elapsed = time.time() - start_time
@@ -286,6 +514,8 @@ def test_large_file_traffic(url_list, request_delay):
                             else:
                                 sys.stdout.write(f"\rDownloading: {format_size(total_downloaded)} @ {speed:5.2f} Mbps")
                             sys.stdout.flush()
+                        read_mark = time.perf_counter()
+                    net_time += time.perf_counter() - read_mark
 
             duration = time.time() - start_time
             if duration == 0: duration = 0.001
@@ -295,6 +525,9 @@ def test_large_file_traffic(url_list, request_delay):
             sys.stdout.write("\r" + " " * 100 + "\r")
             
             log(f"{url[:58]:<60} | {ip_display:<15} | {cc_display:<4} | {size_mb:<10.2f} | {duration:<10.2f} | {avg_mbps:<15.2f}")
+            log(f"    >>> Network read {net_time:.2f} s | Disk write {writer.write_time:.2f} s "
+                f"({'writer thread' if disk_writer else 'inline'}) | Queue stalls {writer.stall_time:.2f} s | "
+                f"Preallocated: {'yes' if writer.preallocated else 'no'}")
 
             # Apply Request Delay
             if request_delay > 0:
@@ -313,8 +546,6 @@ def test_large_file_traffic(url_list, request_delay):
 
 # --- Main Wrapper Loop ---
 def main():
-    setup_logging()
-
     # --- Argument Parser ---
     parser = argparse.ArgumentParser(description="Bandwidth Stress Tester")
     
@@ -327,12 +558,23 @@ def main():
     parser.add_argument("-l", "--loop-delay", type=int, default=30, help="Seconds to pause between main loops (default: 30)")
     parser.add_argument("-r", "--request-delay", type=int, default=5, help="Seconds to wait between specific web requests (default: 5)")
 
+    # Disk Writes
+    parser.add_argument("--disk-writer", action="store_true", help="Preallocate downloads and write them from a background thread via a bounded queue")
+    parser.add_argument("--write-buffer", type=int, default=4, help="MB of chunks coalesced per disk write with --disk-writer (default: 4)")
+    parser.add_argument("--write-queue", type=int, default=8, help="Max buffers queued for the disk writer before reads block (default: 8)")
+
+    # Benchmarking
+    parser.add_argument("--startup-bench", action="store_true", help="Report time from launch to first request, then exit without sending traffic")
+
     args = parser.parse_args()
 
-    # --- Display System Public IP ---
-    log("Checking System Public IP Address...")
-    public_ip = get_system_public_ip()
-    log(f"System Public IP: {public_ip}")
+    # Startup benchmarks only time the launch; don't leave a log file per run
+    if not args.startup_bench:
+        setup_logging()
+
+    # --- Display System Public IP (resolved in the background) ---
+    log("Checking System Public IP Address in the background...")
+    ip_lookup = start_public_ip_lookup()
     log("-" * 30)
 
     # --- Configuration Summary ---
@@ -340,6 +582,7 @@ def main():
     log(f"  Total Duration:   {args.time} minutes")
     log(f"  Loop Delay:       {args.loop_delay} seconds")
     log(f"  Request Delay:    {args.request_delay} seconds")
+    log(f"  Disk Writer:      {f'THREADED, {args.write_buffer} MB buffers x {args.write_queue} queued' if args.disk_writer else 'INLINE'}")
     log("-" * 30)
 
     log("Loading target lists...")
@@ -352,9 +595,18 @@ def main():
         log("Error: No URLs found in text files. Exiting.")
         return
 
+    # --- Load only the libraries the enabled tests need ---
+    import_requests()
+
+    startup_secs = time.perf_counter() - SCRIPT_START
+    log(f"Startup Time:     {startup_secs:.3f} seconds to first request")
+    if args.startup_bench:
+        return
+
     start_time = time.time()
     end_time = start_time + (args.time * 60)
     iteration = 1
+    ip_reported = False
     
     log(f"Starting Bandwidth Stress Test.")
     log(f"Press Ctrl+C to stop manually.\n")
@@ -363,10 +615,13 @@ def main():
         while time.time() < end_time:
             current_time_str = time.strftime("%H:%M:%S", time.localtime())
             log(f"\n>>> ITERATION {iteration} STARTING AT {current_time_str} <<<")
+
+            if not ip_reported:
+                ip_reported = report_public_ip(ip_lookup)
             
             # Pass the request delay to the testing functions
             #test_website_traffic(websites, args.request_delay)
-            test_large_file_traffic(large_files, args.request_delay)
+            test_large_file_traffic(large_files, args.request_delay, args.disk_writer, args.write_buffer, args.write_queue)
             
             iteration += 1
             
@@ -377,6 +632,9 @@ def main():
             
     except KeyboardInterrupt:
         log("\n\nTest stopped by user.")
+
+    if not ip_reported:
+        report_public_ip(ip_lookup, wait=1.0)
     
     log("\nTest Complete.")
 
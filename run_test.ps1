@@ -29,6 +29,35 @@ $RequestDelay = 1
 $DisableWebTest = $false
 $DisableFileTest = $false
 
+# HTTP CACHE SIMULATION
+# Set to $true to send conditional requests (If-None-Match / If-Modified-Since) like a returning browser
+$EnableHttpCache = $false
+# Max URLs held in the simulated client cache
+$CacheSize = 256
+# Fraction of site visits that are warm/returning (0.0 - 1.0)
+$WarmRatio = 0.5
+
+# REPRODUCIBILITY
+# Fixed seed for sub-link / warm-visit selection (leave empty for a random, logged seed)
+$Seed = ""
+# Path of a JSON-lines trace to record every request to (leave empty to disable)
+$RecordTrace = ""
+
+# DISK WRITES (Large File Test)
+# Set to $true to preallocate downloads and write them from a background thread,
+# so on-access AV/DLP scanning does not throttle the network read
+$EnableDiskWriter = $false
+
+# CLIENT PROFILING
+# Set to $true to report per-phase CPU vs wall time and flag when the Python client is the bottleneck
+$EnableProfile = $false
+
+# SOAK MONITORING
+# Set to $true to log RSS, top allocators, GC and handle counts during long runs
+$EnableSoak = $false
+# Seconds between soak samples
+$SoakInterval = 300
+
 # ============================================================================
 # EXECUTION LOGIC
 # ============================================================================
@@ -64,6 +93,12 @@ $PyArgs = @(
 # Append flags if user disabled specific tests
 if ($DisableWebTest) { $PyArgs += "--no-web" }
 if ($DisableFileTest) { $PyArgs += "--no-files" }
+if ($EnableHttpCache) { $PyArgs += @("--http-cache", "--cache-size", $CacheSize, "--warm-ratio", $WarmRatio) }
+if ($Seed -ne "") { $PyArgs += @("--seed", $Seed) }
+if ($RecordTrace -ne "") { $PyArgs += @("--record-trace", $RecordTrace) }
+if ($EnableDiskWriter) { $PyArgs += "--disk-writer" }
+if ($EnableProfile) { $PyArgs += "--profile" }
+if ($EnableSoak) { $PyArgs += @("--soak", "--soak-interval", $SoakInterval) }
 
 # 4. Display Status
 Write-Host "Starting Bandwidth Stress Test..." -ForegroundColor Cyan
@@ -0,0 +1,71 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# --- Configuration Constants ---
+# (script, extra args) pairs; each run uses --startup-bench so no test traffic is sent
+SCENARIOS = [
+    ("bandwidth_test.py", ["--no-web"]),
+    ("bandwidth_test.py", ["--no-files"]),
+    ("bandwidth_test.py", []),
+    ("DownloadTrafficSimScript.py", []),
+]
+TARGET_SECONDS = 1.0
+
+def run_once(script_path, extra_args):
+    """
+    Launches one script with --startup-bench.
+    Returns (wall-clock seconds for the whole process, in-script startup seconds or None).
+    """
+    cmd = [sys.executable, script_path, "--startup-bench"] + extra_args
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    wall = time.perf_counter() - start
+
+    reported = None
+    for line in result.stdout.splitlines():
+        if line.startswith("Startup Time:"):
+            try:
+                reported = float(line.split()[2])
+            except (IndexError, ValueError):
+                pass
+    return wall, reported
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup Time Benchmark")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="Launches per scenario (default: 5)")
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    print(f"{'Scenario':<45} | {'Median Wall (s)':<15} | {'Median To 1st Req (s)':<21} | {'Result':<6}")
+    print("-" * 97)
+
+    all_passed = True
+    for script, extra_args in SCENARIOS:
+        walls = []
+        reported = []
+        for _ in range(args.runs):
+            wall, startup = run_once(os.path.join(script_dir, script), extra_args)
+            walls.append(wall)
+            if startup is not None:
+                reported.append(startup)
+
+        median_wall = statistics.median(walls)
+        median_reported = statistics.median(reported) if reported else None
+        passed = median_reported is not None and median_wall < TARGET_SECONDS
+        all_passed = all_passed and passed
+
+        name = " ".join([script] + extra_args)
+        reported_str = f"{median_reported:.3f}" if median_reported is not None else "n/a"
+        print(f"{name:<45} | {median_wall:<15.3f} | {reported_str:<21} | {'PASS' if passed else 'FAIL':<6}")
+
+    print("-" * 97)
+    print(f"Target: whole process reaches first request in under {TARGET_SECONDS:.1f} second(s).")
+    sys.exit(0 if all_passed else 1)
+
+if __name__ == "__main__":
+    main()